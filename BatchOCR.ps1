@@ -38,7 +38,7 @@ if ($doExecute -match '^(y|yes)$') { $executeFlag = "--execute" }
 
 # --- Defaults (you can press Enter to keep) ---
 $parallelFiles = Prompt-Default "Parallel PDFs to process (--parallel-files)" "6"
-$ocrJobs       = Prompt-Default "OCRmyPDF jobs per file (--ocr-jobs)" "2"
+$ocrJobs       = Prompt-Default "OCRmyPDF jobs per file (--ocr-jobs, auto = CPU count / parallel PDFs)" "auto"
 $samplePages   = Prompt-Default "Sample pages for detection (--sample-pages)" "10"
 
 $deskew = Read-Host "Deskew? (Y/N). If Y, deskew happens on retry by default."
@@ -87,7 +87,8 @@ $cmdArgs = @(
 )
 if ($executeFlag) { $cmdArgs += $executeFlag }
 
-$cmdArgs += @("--parallel-files", $parallelFiles, "--ocr-jobs", $ocrJobs, "--sample-pages", $samplePages, "--log", $logPath)
+$cmdArgs += @("--parallel-files", $parallelFiles, "--sample-pages", $samplePages, "--log", $logPath)
+if ($ocrJobs -ne "auto") { $cmdArgs += @("--ocr-jobs", $ocrJobs) }
 if ($deskewFlags.Count -gt 0) { $cmdArgs += $deskewFlags }
 
 Write-Host "Running:"
@@ -1,16 +1,33 @@
 from __future__ import annotations
 
 import argparse
+import asyncio
+import atexit
+import collections
+import contextlib
+import functools
+import heapq
+import importlib.util
 import json
+import locale
 import os
-import subprocess
-from concurrent.futures import ThreadPoolExecutor, as_completed
+import queue
+import re
+import sys
+import threading
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple
+from typing import AsyncIterator, Awaitable, BinaryIO, Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple
 
 import fitz  # PyMuPDF
 
+try:
+    import orjson  # optional: faster JSONL logging
+except ImportError:
+    orjson = None
+
 # ----------------------------
 # Distinctive tags (unlikely to collide)
 # ----------------------------
@@ -25,14 +42,45 @@ DEFAULT_SAMPLE_PAGES = 20
 DEFAULT_PAGE_MIN_CHARS = 150
 DEFAULT_MIN_COVERAGE = 0.30
 
+# Quick sniff (opt-in): raw-byte scan of the start and end of the file before MuPDF
+SNIFF_BYTES = 64 * 1024
+SNIFF_MIN_IMAGES = 4            # image XObjects and no /Font at all -> scan, needs OCR
+SNIFF_RULES = 2                 # bump when quick_sniff changes so cached verdicts are dropped
+_SNIFF_FONT = re.compile(rb"/Font\b")
+_SNIFF_IMAGE = re.compile(rb"/Subtype\s*/Image\b")
+
+# Deletes whitespace via str.translate, to count a page's text characters in one C pass.
+_WS_TABLE = str.maketrans("", "", " \t\r\n\f\v")
+
 # ----------------------------
 # OCR defaults (books)
 # ----------------------------
 DEFAULT_LANG = "eng"
 DEFAULT_OPTIMIZE = "1"          # retry uses 0
 DEFAULT_RENDERER = "sandwich"
-DEFAULT_OCR_JOBS = 2            # per-file internal parallelism
 DEFAULT_PARALLEL_FILES = 4      # number of PDFs processed concurrently
+DEFAULT_OCR_BACKEND = "subprocess"  # or "inprocess" (API on a thread), "pool" (persistent worker processes)
+STDERR_TAIL_LINES = 64          # ocrmypdf stderr lines kept per run (the rest is discarded)
+ERROR_EXCERPT_CHARS = 800       # budget for the stderr excerpt stored in a record's "error"
+DEFAULT_SHARD_THRESHOLD = 0     # pages; above this, split and OCR shards in parallel (0 = off)
+
+# Input problems a retry with different settings can't fix (ocrmypdf exit codes:
+# 2 input file, 6 prior OCR found, 8 encrypted).
+FATAL_OCR_RETURNCODES = {2, 6, 8}
+FATAL_OCR_ERRORS = re.compile(
+    r"(encrypted|DigitalSignatureError|EncryptedPdfError|InputFileError|PriorOcrFoundError)",
+    re.IGNORECASE,
+)
+
+# ----------------------------
+# Scheduling
+# ----------------------------
+DETECT_CHUNK = 4                # PDFs per detection task sent to a worker process
+# ProcessPoolExecutor rejects max_workers > 61 on Windows (WaitForMultipleObjects limit).
+MAX_PROCESS_WORKERS = 61 if sys.platform == "win32" else None
+DEFAULT_DETECT_WORKERS = min(os.cpu_count() or 1, MAX_PROCESS_WORKERS or sys.maxsize)
+SIZE_ORDER_WINDOW = 1024        # PDFs buffered from the walker to submit largest-first
+LOG_FLUSH_EVERY = 64            # JSONL records between explicit flushes
 
 
 @dataclass
@@ -40,26 +88,123 @@ class DetectResult:
     sampled_pages: int
     texty_pages: int
     coverage: float
+    page_count: int = 0
+    sniffed: bool = False       # decided by quick_sniff, no pages sampled
+
 
+@dataclass(frozen=True)
+class DetectParams:
+    """Picklable subset of the CLI options needed by detection workers."""
+    sample_pages: int
+    page_min_chars: int
+    min_coverage: float
+    quick_sniff: bool = False
 
-def is_tagged(p: Path) -> bool:
-    n = p.name
+
+def is_tagged_name(n: str) -> bool:
     return (TAG_ORIG in n) or (TAG_OCR in n) or (TAG_TMP in n)
 
 
+def iter_untagged_pdfs(root: Path) -> Iterator[os.DirEntry]:
+    """Recursively yield scandir entries of untagged PDFs under root, streaming as directories are read.
+
+    Names are filtered as plain strings, and entries carry the stat info scandir already
+    fetched. Unreadable directories are skipped.
+    """
+    try:
+        it = os.scandir(root)
+    except OSError:
+        return
+    subdirs = []
+    with it:
+        for entry in it:
+            try:
+                if entry.is_dir(follow_symlinks=False):
+                    subdirs.append(entry.path)
+                    continue
+                if not entry.is_file():
+                    continue
+            except OSError:
+                continue
+            name = entry.name
+            if name.lower().endswith(".pdf") and not is_tagged_name(name):
+                yield entry
+    for d in subdirs:
+        yield from iter_untagged_pdfs(d)
+
+
+def largest_first(entries: Iterable[os.DirEntry], window: int) -> Iterator[Path]:
+    """Yield paths biggest file first, looking ahead at most `window` entries.
+
+    Starting long books early keeps one of them from finishing alone at the end of the
+    run (longest-processing-time-first). Within a library of up to `window` PDFs the
+    order is exact, but nothing is yielded until the walk has finished; beyond that it
+    is largest-first within a sliding buffer, and the first path comes out once
+    `window` + 1 PDFs have been found.
+    """
+    heap = []
+    for seq, entry in enumerate(entries):
+        try:
+            size = entry.stat().st_size  # free on Windows: scandir already has it
+        except OSError:
+            size = 0
+        heapq.heappush(heap, (-size, seq, entry.path))
+        if len(heap) > window:
+            yield Path(heapq.heappop(heap)[2])
+    while heap:
+        yield Path(heapq.heappop(heap)[2])
+
+
+def chunked(items: Iterable, n: int) -> Iterator[List]:
+    """Group items into lists of up to n, pulling lazily."""
+    batch = []
+    for item in items:
+        batch.append(item)
+        if len(batch) >= n:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+# Names unique_path has handed out to files still in flight (plus tagged files already in
+# their directories), so two in-flight files can never be given the same target.
+_RESERVED: set = set()
+_SEEDED_DIRS: set = set()
+_RES_LOCK = threading.Lock()
+
+
+def _seed_reserved(parent: Path) -> None:
+    # Every name unique_path hands out carries a tag, so only tagged files can collide.
+    try:
+        with os.scandir(parent) as it:
+            _RESERVED.update(str(parent / e.name) for e in it if is_tagged_name(e.name))
+    except OSError:
+        pass
+    _SEEDED_DIRS.add(str(parent))
+
+
 def unique_path(path: Path) -> Path:
-    """If path exists, append (1), (2), ... before extension."""
-    if not path.exists():
-        return path
+    """If path exists or is reserved, append (1), (2), ... before extension; reserve the result."""
     parent = path.parent
     stem = path.stem
     suffix = path.suffix
-    i = 1
-    while True:
-        candidate = parent / f"{stem} ({i}){suffix}"
-        if not candidate.exists():
-            return candidate
-        i += 1
+    with _RES_LOCK:
+        if str(parent) not in _SEEDED_DIRS:
+            _seed_reserved(parent)
+        candidate = path
+        i = 1
+        while str(candidate) in _RESERVED or candidate.exists():
+            candidate = parent / f"{stem} ({i}){suffix}"
+            i += 1
+        _RESERVED.add(str(candidate))
+        return candidate
+
+
+def release_paths(*paths: Path) -> None:
+    """Drop reservations once their files exist (or are gone) on disk; exists() covers them from then on."""
+    with _RES_LOCK:
+        _RESERVED.difference_update(str(p) for p in paths)
 
 
 def sampled_page_indices(n_pages: int, sample_pages: int) -> List[int]:
@@ -67,39 +212,200 @@ def sampled_page_indices(n_pages: int, sample_pages: int) -> List[int]:
         return []
     if n_pages <= sample_pages:
         return list(range(n_pages))
-    idxs = set()
-    for i in range(sample_pages):
-        j = round(i * (n_pages - 1) / (sample_pages - 1))
-        idxs.add(int(j))
-    return sorted(idxs)
+    if sample_pages <= 1:
+        return [0] if sample_pages == 1 else []
+    # Evenly spaced and non-decreasing, so duplicates are adjacent: dedupe in order, no sort.
+    span = n_pages - 1
+    last = sample_pages - 1
+    return list(dict.fromkeys(round(i * span / last) for i in range(sample_pages)))
+
+
+def spread_order(idxs: List[int]) -> List[int]:
+    """Reorder by repeated bisection (middle, then quarters, eighths, ...) so every prefix
+    is spread over the book.
+
+    Covers and front/back matter are the least representative pages; reaching them late
+    lets detection's early exit trigger sooner.
+    """
+    order = []
+    spans = collections.deque([(0, len(idxs) - 1)])
+    while spans:
+        lo, hi = spans.popleft()
+        if lo > hi:
+            continue
+        mid = (lo + hi) // 2
+        order.append(idxs[mid])
+        spans.append((lo, mid - 1))
+        spans.append((mid + 1, hi))
+    return order
+
+
+def page_is_texty(txt: str, page_min_chars: int) -> bool:
+    """True if txt has at least page_min_chars non-whitespace characters."""
+    if len(txt) < page_min_chars:
+        return False  # can't qualify; skip building the stripped copy
+    return len(txt.translate(_WS_TABLE)) >= page_min_chars
+
+
+@contextlib.contextmanager
+def open_pdf(pdf_path: Path) -> Iterator["fitz.Document"]:
+    """Open a PDF with PyMuPDF and close it however the block exits."""
+    doc = fitz.open(pdf_path)
+    try:
+        yield doc
+    finally:
+        doc.close()
 
 
-def detect_text_coverage(pdf_path: Path, sample_pages: int, page_min_chars: int) -> DetectResult:
-    """Fraction of sampled pages with meaningful text."""
+def detect_text_coverage(pdf_path: Path, sample_pages: int, page_min_chars: int,
+                         min_coverage: Optional[float] = None) -> DetectResult:
+    """Fraction of sampled pages with meaningful text.
+
+    If min_coverage is given, sampling stops as soon as the skip/OCR decision can no
+    longer change; the result then reflects only the pages actually read.
+    """
     try:
-        doc = fitz.open(pdf_path)
+        with open_pdf(pdf_path) as doc:
+            return sample_coverage(doc, sample_pages, page_min_chars, min_coverage)
     except Exception:
         return DetectResult(sampled_pages=0, texty_pages=0, coverage=0.0)
 
+
+def sample_coverage(doc: "fitz.Document", sample_pages: int, page_min_chars: int,
+                    min_coverage: Optional[float]) -> DetectResult:
+    """detect_text_coverage on an already-open document."""
     n = doc.page_count
     idxs = sampled_page_indices(n, sample_pages)
+    total = len(idxs)
     texty = 0
+    sampled = 0
 
-    for i in idxs:
+    for i in spread_order(idxs):
+        sampled += 1
         try:
-            txt = doc.load_page(i).get_text().strip()
-            if len(txt) >= page_min_chars:
+            if page_is_texty(doc.load_page(i).get_text("text"), page_min_chars):
                 texty += 1
         except Exception:
             pass
+        if min_coverage is not None:
+            if texty / total >= min_coverage:
+                break  # enough texty pages already: skip
+            if (texty + total - sampled) / total < min_coverage:
+                break  # can't reach coverage even if the rest are texty: OCR
 
-    doc.close()
-    sampled = len(idxs)
     cov = (texty / sampled) if sampled else 0.0
-    return DetectResult(sampled_pages=sampled, texty_pages=texty, coverage=cov)
+    return DetectResult(sampled_pages=sampled, texty_pages=texty, coverage=cov, page_count=n)
+
+
+class DetectCache:
+    """DetectResults from earlier runs, keyed by absolute path and valid while (size, mtime_ns) match.
+
+    Stored as JSON together with the detection settings; a cache written with different
+    settings is ignored. After a complete walk, prune(root) drops entries under root that
+    weren't seen, so files that were OCR'd (and renamed), moved or deleted don't pile up;
+    entries for other roots sharing the file are kept.
+    """
+
+    def __init__(self, path: Path, params: DetectParams):
+        self.path = path
+        self.params = params
+        self.entries: Dict[str, list] = {}
+        self._stats: Dict[str, Tuple[int, int]] = {}
+        self._seen: Set[str] = set()
+
+    def load(self) -> None:
+        try:
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return
+        if data.get("params") == self._params_json():
+            self.entries = data.get("entries", {})
+
+    def save(self) -> None:
+        data = {"params": self._params_json(), "entries": self.entries}
+        tmp = self.path.with_name(self.path.name + ".tmp")
+        tmp.write_text(json.dumps(data, ensure_ascii=False), encoding="utf-8")
+        os.replace(tmp, self.path)
+
+    def lookup(self, paths: List[Path]) -> Tuple[List[Tuple[Path, DetectResult]], List[Path]]:
+        """Split paths into cached (path, result) pairs and paths that still need detection."""
+        hits = []
+        misses = []
+        for p in paths:
+            key = self.key(p)
+            self._seen.add(key)
+            try:
+                st = p.stat()
+            except OSError:
+                misses.append(p)
+                continue
+            stat = (st.st_size, st.st_mtime_ns)
+            entry = self.entries.get(key)
+            if entry is not None and tuple(entry[:2]) == stat:
+                hits.append((p, DetectResult(*entry[2:])))
+            else:
+                self._stats[key] = stat
+                misses.append(p)
+        return hits, misses
+
+    def store(self, src: Path, det: DetectResult) -> None:
+        key = self.key(src)
+        stat = self._stats.pop(key, None)
+        if stat is not None:
+            self.entries[key] = [*stat, det.sampled_pages, det.texty_pages, det.coverage, det.page_count,
+                                      det.sniffed]
+
+    def prune(self, root: Path) -> None:
+        """Forget entries under root that lookup() hasn't been asked about this run."""
+        prefix = self.key(root).rstrip(os.sep) + os.sep
+        self.entries = {k: v for k, v in self.entries.items() if k in self._seen or not k.startswith(prefix)}
+
+    @staticmethod
+    def key(p: Path) -> str:
+        """The same string for the same file however its root was spelled (case too, on Windows)."""
+        return os.path.normcase(os.path.abspath(p))
+
+    def _params_json(self) -> Dict:
+        return {"sample_pages": self.params.sample_pages, "page_min_chars": self.params.page_min_chars,
+                "min_coverage": self.params.min_coverage, "quick_sniff": self.params.quick_sniff and SNIFF_RULES}
+
+
+def quick_sniff(pdf_path: Path) -> bool:
+    """True if the raw bytes show an obvious scan: several image XObjects and no font at all.
+
+    Reads only the first and last SNIFF_BYTES. It never decides a file has text (font
+    references aren't evidence of it; scans often carry a small footer font), so anything
+    that isn't an obvious scan, including PDFs with compressed object streams, is sampled.
+    """
+    try:
+        with open(pdf_path, "rb") as f:
+            head = f.read(SNIFF_BYTES)
+            size = f.seek(0, os.SEEK_END)
+            tail = b""
+            if size > len(head):
+                f.seek(max(len(head), size - SNIFF_BYTES))
+                tail = f.read()
+    except OSError:
+        return False
+
+    if _SNIFF_FONT.search(head) or _SNIFF_FONT.search(tail):
+        return False
+    images = len(_SNIFF_IMAGE.findall(head)) + len(_SNIFF_IMAGE.findall(tail))
+    return images >= SNIFF_MIN_IMAGES
+
+
+def detect_one(pdf_path: Path, params: DetectParams) -> DetectResult:
+    if params.quick_sniff and quick_sniff(pdf_path):
+        return DetectResult(sampled_pages=0, texty_pages=0, coverage=0.0, sniffed=True)
+    return detect_text_coverage(pdf_path, params.sample_pages, params.page_min_chars, params.min_coverage)
+
 
+def detect_batch(paths: List[Path], params: DetectParams) -> List[Tuple[Path, DetectResult]]:
+    """Detection entry point for the process pool; one task covers several PDFs."""
+    return [(p, detect_one(p, params)) for p in paths]
 
-def run_ocrmypdf(src: Path, out_path: Path,
+
+async def run_ocrmypdf(src: Path, out_path: Path,
                  lang: str, optimize: str, renderer: str, jobs: int,
                  continue_soft: bool,
                  output_type: str,
@@ -119,20 +425,91 @@ def run_ocrmypdf(src: Path, out_path: Path,
     cmd += extra_args
     cmd += [str(src), str(out_path)]
 
-    proc = subprocess.run(cmd, capture_output=True, text=True)
-    return proc.returncode, proc.stdout, proc.stderr
+    # stderr can run to megabytes of warnings on long books; keep only the tail we log.
+    proc = await asyncio.create_subprocess_exec(
+        *cmd, stdout=asyncio.subprocess.DEVNULL, stderr=asyncio.subprocess.PIPE)
+    tail = collections.deque(maxlen=STDERR_TAIL_LINES)
+    while True:
+        try:
+            line = await proc.stderr.readline()
+        except ValueError:
+            continue  # a single line over the stream limit; it has been dropped
+        if not line:
+            break
+        tail.append(line)
+    rc = await proc.wait()
+    # Same decoding as text=True: redirected, ocrmypdf writes the locale encoding (ANSI code page on Windows).
+    return rc, "", b"".join(tail).decode(locale.getpreferredencoding(False), errors="replace")
+
+
+def ocr_inprocess(src: Path, out_path: Path,
+                  lang: str, optimize: str, renderer: str, jobs: int,
+                  continue_soft: bool,
+                  output_type: str,
+                  extra_args: List[str]) -> Tuple[int, str, str]:
+    """Same contract as run_ocrmypdf, but through the ocrmypdf Python API (no interpreter per file).
+
+    Only --deskew is understood from extra_args; main() falls back to the subprocess backend
+    for anything else. The error text is the exception's type and message, which is what
+    is_fatal_ocr_error() matches on. (stderr isn't redirected: that is process-global and
+    concurrent runs would mix their output.)
+    """
+    import ocrmypdf  # deferred so detection worker processes don't pay for the import
+
+    try:
+        rc = ocrmypdf.ocr(
+            src, out_path,
+            language=lang.split("+"),
+            skip_text=True,
+            output_type=output_type,
+            pdf_renderer=renderer,
+            jobs=jobs,
+            optimize=int(optimize),
+            continue_on_soft_render_error=continue_soft,
+            deskew="--deskew" in extra_args,
+            progress_bar=False,
+        )
+        return int(rc), "", ""
+    except Exception as e:
+        return int(getattr(e, "exit_code", 15)), "", f"{type(e).__name__}: {e}"
+
 
+def is_fatal_ocr_error(rc: int, err: str) -> bool:
+    """True if the failure is a deterministic input problem not worth a second attempt."""
+    return rc in FATAL_OCR_RETURNCODES or bool(err and FATAL_OCR_ERRORS.search(err))
 
-def process_one_pdf(src: Path, args: argparse.Namespace) -> Dict:
-    """Process a single PDF: detect -> OCR to temp -> rename original -> promote temp."""
-    det = detect_text_coverage(src, args.sample_pages, args.page_min_chars)
-    needs_ocr = (det.sampled_pages == 0) or (det.coverage < args.min_coverage)
 
-    record: Dict = {
+def error_excerpt(err: str, limit: int = ERROR_EXCERPT_CHARS) -> str:
+    """The last whole lines of err that fit in limit characters.
+
+    Only a final line longer than limit on its own is cut, keeping its end.
+    """
+    lines = err.strip().splitlines()
+    kept = []
+    size = 0
+    for line in reversed(lines):
+        size += len(line) + 1
+        if size > limit + 1:
+            break
+        kept.append(line)
+    if not kept and lines:
+        return lines[-1][-limit:]
+    return "\n".join(reversed(kept))
+
+
+def should_ocr(det: DetectResult, min_coverage: float) -> bool:
+    if det.sniffed:
+        return det.coverage < min_coverage
+    return (det.sampled_pages == 0) or (det.coverage < min_coverage)
+
+
+def new_record(src: Path, det: DetectResult, needs_ocr: bool) -> Dict:
+    return {
         "file": str(src),
         "sampled_pages": det.sampled_pages,
         "texty_pages": det.texty_pages,
         "coverage": det.coverage,
+        "sniffed": det.sniffed,
         "needs_ocr": needs_ocr,
         "action": None,
         "error": None,
@@ -140,23 +517,85 @@ def process_one_pdf(src: Path, args: argparse.Namespace) -> Dict:
         "attempts": 0,
     }
 
-    if not needs_ocr:
-        record["action"] = "skip"
-        return record
 
-    base = src.with_suffix("")
-    orig_tagged = unique_path(Path(str(base) + TAG_ORIG + ".pdf"))
-    ocr_final   = unique_path(Path(str(base) + TAG_OCR  + ".pdf"))
-    ocr_tmp     = unique_path(Path(str(base) + TAG_TMP  + ".pdf"))
+def shard_ranges(n_pages: int, n_shards: int) -> List[Tuple[int, int]]:
+    """Split pages 0..n_pages-1 into up to n_shards contiguous (first, last) ranges."""
+    size = -(-n_pages // max(1, n_shards))
+    return [(first, min(first + size, n_pages) - 1) for first in range(0, n_pages, size)]
 
-    record["tmp"] = str(ocr_tmp)
-    record["ocr"] = str(ocr_final)
-    record["orig"]= str(orig_tagged)
 
-    if not args.execute:
-        record["action"] = "would_ocr"
-        return record
+def split_pdf(src: Path, parts: List[Tuple[int, int, Path]]) -> Tuple[Dict, List]:
+    """Write each (first, last) page range of src to its own PDF.
+
+    Returns src's metadata and outline, read under the same open, for merge_pdfs.
+    """
+    with open_pdf(src) as doc:
+        for first, last, path in parts:
+            with fitz.open() as part:
+                part.insert_pdf(doc, from_page=first, to_page=last)
+                part.save(path)
+        try:
+            toc = doc.get_toc(simple=False)
+        except Exception:
+            toc = []
+        return doc.metadata, toc
 
+
+def merge_pdfs(parts: List[Path], out_path: Path, metadata: Dict, toc: List) -> None:
+    """Concatenate OCR'd shards into out_path with the original's metadata and outline."""
+    with fitz.open() as out:
+        for path in parts:
+            with open_pdf(path) as part:
+                out.insert_pdf(part)
+        out.set_metadata(metadata)
+        try:
+            out.set_toc(toc)
+        except Exception:
+            pass  # a malformed outline shouldn't fail an otherwise good OCR
+        out.save(out_path, garbage=1)
+
+
+# Runs one ocrmypdf job (run_ocrmypdf's keyword arguments) and returns (rc, stdout, stderr).
+OcrRunner = Callable[..., Awaitable[Tuple[int, str, str]]]
+
+
+def make_ocr_runner(backend: str, workers: int, stack: contextlib.ExitStack) -> OcrRunner:
+    """Dispatch OCR jobs to the chosen backend, at most `workers` at a time.
+
+    subprocess: a fresh ocrmypdf process per job. inprocess: the ocrmypdf API on a dedicated
+    thread pool (not the loop's default executor, which the walker, cache and finalize share).
+    pool: the ocrmypdf API in long-lived worker processes, so interpreter startup and the
+    ocrmypdf import are paid once per worker rather than per job. A worker that dies takes
+    the whole ProcessPoolExecutor down with it; its jobs fail with rc 15 and a fresh pool
+    is started for the rest. Executors are shut down when `stack` closes.
+    """
+    slots = asyncio.Semaphore(workers)
+    ocr_pool: Optional[Executor] = None
+    if backend == "pool":
+        ocr_pool = stack.enter_context(ProcessPoolExecutor(max_workers=workers))
+    elif backend == "inprocess":
+        ocr_pool = stack.enter_context(ThreadPoolExecutor(max_workers=workers, thread_name_prefix="ocr"))
+
+    async def run(**kwargs) -> Tuple[int, str, str]:
+        nonlocal ocr_pool
+        async with slots:
+            if backend == "subprocess":
+                return await run_ocrmypdf(**kwargs)
+            executor = ocr_pool
+            try:
+                return await asyncio.get_running_loop().run_in_executor(
+                    executor, functools.partial(ocr_inprocess, **kwargs))
+            except BrokenProcessPool:
+                if ocr_pool is executor:  # first job to notice replaces it
+                    ocr_pool = stack.enter_context(ProcessPoolExecutor(max_workers=workers))
+                return 15, "", "worker crashed"
+
+    return run
+
+
+async def ocr_attempts(src: Path, out_path: Path, args: argparse.Namespace, record: Dict,
+                       run_ocr: OcrRunner) -> None:
+    """Run ocrmypdf (with one retry) to out_path, recording attempts/returncode/error."""
     # Attempt 1: optimize=DEFAULT (usually 1)
     attempts = [
         ("1", False),  # (optimize, deskew_on_retry?) -> we keep deskew out by default
@@ -172,9 +611,9 @@ def process_one_pdf(src: Path, args: argparse.Namespace) -> Dict:
         if args.deskew and (args.deskew_mode == "always" or (args.deskew_mode == "retry" and attempt_idx == 2)):
             extra.append("--deskew")
 
-        rc, out, err = run_ocrmypdf(
+        rc, out, err = await run_ocr(
             src=src,
-            out_path=ocr_tmp,
+            out_path=out_path,
             lang=args.lang,
             optimize=opt_level,
             renderer=args.renderer,
@@ -185,49 +624,233 @@ def process_one_pdf(src: Path, args: argparse.Namespace) -> Dict:
         )
 
         record["returncode"] = rc
-        if rc == 0 and ocr_tmp.exists():
+        if rc == 0 and out_path.exists():
             break
 
         # cleanup temp between attempts
+        if out_path.exists():
+            try:
+                out_path.unlink()
+            except Exception:
+                pass
+
+        record["error"] = (error_excerpt(err) if err else "ocrmypdf failed")
+
+        if is_fatal_ocr_error(rc, err):
+            record["error"] = "not retried (input error): " + record["error"]
+            break
+
+
+async def ocr_sharded(src: Path, ocr_tmp: Path, det: DetectResult, args: argparse.Namespace,
+                      record: Dict, run_ocr: OcrRunner, pool: Executor) -> None:
+    """Split src into page-range shards, OCR them concurrently, merge the results to ocr_tmp."""
+    loop = asyncio.get_running_loop()
+    base = str(src.with_suffix("")) + TAG_TMP
+    ranges = shard_ranges(det.page_count, args.parallel_files)
+    parts = [(first, last, unique_path(Path(f"{base} part{k}.pdf")))
+             for k, (first, last) in enumerate(ranges, start=1)]
+    outs = [unique_path(Path(f"{base} part{k} ocr.pdf")) for k in range(1, len(parts) + 1)]
+    shard_records = [{"attempts": 0, "returncode": None, "error": None} for _ in parts]
+    record["shards"] = len(parts)
+
+    try:
+        # PyMuPDF isn't thread-safe, so split/merge run in the detection processes.
+        metadata, toc = await loop.run_in_executor(pool, split_pdf, src, parts)
+        await asyncio.gather(*(ocr_attempts(path, out, args, rec, run_ocr)
+                               for (_, _, path), out, rec in zip(parts, outs, shard_records)))
+
+        record["attempts"] = max(rec["attempts"] for rec in shard_records)
+        failed = [rec for rec, out in zip(shard_records, outs) if not out.exists()]
+        if failed:
+            record["returncode"] = failed[0]["returncode"]
+            record["error"] = failed[0]["error"]
+            return
+        record["returncode"] = 0
+
+        await loop.run_in_executor(pool, merge_pdfs, outs, ocr_tmp, metadata, toc)
+    except Exception as e:
+        record["error"] = f"shard split/merge failed: {e}"
         if ocr_tmp.exists():
             try:
                 ocr_tmp.unlink()
             except Exception:
                 pass
+    finally:
+        shard_paths = [p for _, _, p in parts] + outs
+        for path in shard_paths:
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                pass
+            except Exception:
+                record["error"] = (record["error"] or "") + f" | shard cleanup failed: {path.name}"
+        release_paths(*shard_paths)
 
-        record["error"] = (err.strip()[:800] if err else "ocrmypdf failed")
 
+async def ocr_one(src: Path, det: DetectResult, args: argparse.Namespace,
+                  run_ocr: OcrRunner, pool: Executor) -> Dict:
+    """OCR a PDF that detection flagged: OCR to temp -> promote temp -> rename original.
+
+    run_ocr is shared by all files and limits concurrent ocrmypdf runs; pool runs PyMuPDF work.
+    """
+    record = new_record(src, det, True)
+
+    base = src.with_suffix("")
+    orig_tagged = unique_path(Path(str(base) + TAG_ORIG + ".pdf"))
+    ocr_final   = unique_path(Path(str(base) + TAG_OCR  + ".pdf"))
+    ocr_tmp     = unique_path(Path(str(base) + TAG_TMP  + ".pdf"))
+
+    record["tmp"] = str(ocr_tmp)
+    record["ocr"] = str(ocr_final)
+    record["orig"]= str(orig_tagged)
+
+    if not args.execute:
+        # Names stay reserved so the dry-run report matches what --execute would pick.
+        record["action"] = "would_ocr"
+        return record
+
+    if args.shard_threshold and det.page_count > args.shard_threshold:
+        await ocr_sharded(src, ocr_tmp, det, args, record, run_ocr, pool)
+    else:
+        await ocr_attempts(src, ocr_tmp, args, record, run_ocr)
+
+    # The rename pair runs back-to-back on a worker thread, off the event loop.
+    loop = asyncio.get_running_loop()
+    try:
+        return await loop.run_in_executor(None, finalize_ocr, record, src, ocr_tmp, orig_tagged, ocr_final)
+    finally:
+        release_paths(orig_tagged, ocr_final, ocr_tmp)
+
+
+def finalize_ocr(record: Dict, src: Path, ocr_tmp: Path, orig_tagged: Path, ocr_final: Path) -> Dict:
+    """Promote temp -> OCR, then rename original -> ORIG.
+
+    In this order every failure leaves a consistent tree, so nothing needs rolling back.
+    Plain rename (not os.replace) is deliberate: on Windows it refuses to overwrite.
+    """
     # If still no temp output, fail safely
     if not ocr_tmp.exists():
         record["action"] = "ocr_failed"
         return record
 
-    # Rename original -> ORIG
+    # Promote temp -> OCR; on failure the original is untouched
     try:
-        src.rename(orig_tagged)
+        ocr_tmp.rename(ocr_final)
     except Exception as e:
-        record["action"] = "rename_orig_failed"
+        record["action"] = "promote_failed"
         record["error"] = str(e)
         # keep temp for manual review
         return record
 
-    # Promote temp -> OCR
+    # Rename original -> ORIG; on failure the OCR output exists and the original keeps its name
     try:
-        ocr_tmp.rename(ocr_final)
+        src.rename(orig_tagged)
     except Exception as e:
-        record["action"] = "promote_failed"
+        record["action"] = "rename_orig_failed"
         record["error"] = str(e)
-        # rollback original name best-effort
-        try:
-            orig_tagged.rename(src)
-        except Exception:
-            record["error"] += " | rollback_failed"
         return record
 
     record["action"] = "ocr_success"
     return record
 
 
+async def run_pipeline(pdfs: Iterable[Path], args: argparse.Namespace,
+                       cache: Optional[DetectCache] = None) -> AsyncIterator[Dict]:
+    """Detect in a process pool, OCR flagged files from the event loop; yield records as they finish.
+
+    Detection is CPU-bound Python + MuPDF work, so it scales with cores in separate
+    processes. OCR is just waiting on ocrmypdf children, which one event loop thread
+    handles for all of them. Submission is bounded: at most one detection batch per
+    detection worker, and no new detection while 2 * parallel_files files wait on OCR, so
+    the number of in-flight files stays constant however large the tree is. (Whatever
+    feeds `pdfs` may buffer ahead of that; main() orders them through largest_first().)
+    """
+    loop = asyncio.get_running_loop()
+    params = DetectParams(args.sample_pages, args.page_min_chars, args.min_coverage, args.quick_sniff)
+    max_detecting = args.detect_workers
+    max_ocr_backlog = args.parallel_files * 2
+    batches = chunked(pdfs, DETECT_CHUNK)
+    exhausted = False
+    detecting = set()
+    ocring = set()
+
+    def route(results: List[Tuple[Path, DetectResult]]) -> Iterator[Dict]:
+        """Start OCR for flagged files; yield skip records for the rest."""
+        for src, det in results:
+            if should_ocr(det, args.min_coverage):
+                ocring.add(asyncio.ensure_future(ocr_one(src, det, args, run_ocr, detect_pool)))
+            else:
+                record = new_record(src, det, False)
+                record["action"] = "skip"
+                yield record
+
+    with contextlib.ExitStack() as stack:
+        detect_pool = stack.enter_context(ProcessPoolExecutor(max_workers=args.detect_workers))
+        run_ocr = make_ocr_runner(args.ocr_backend, args.parallel_files, stack)
+        while True:
+            while not exhausted and len(detecting) < max_detecting and len(ocring) < max_ocr_backlog:
+                # scandir can block on slow drives; keep it off the event loop
+                batch = await loop.run_in_executor(None, next, batches, None)
+                if batch is None:
+                    exhausted = True
+                    break
+                if cache is not None:
+                    hits, batch = await loop.run_in_executor(None, cache.lookup, batch)
+                    for record in route(hits):
+                        yield record
+                    if not batch:
+                        continue
+                detecting.add(loop.run_in_executor(detect_pool, detect_batch, batch, params))
+
+            if not detecting and not ocring:
+                return
+
+            done, _ = await asyncio.wait(detecting | ocring, return_when=asyncio.FIRST_COMPLETED)
+            for fut in done:
+                if fut in ocring:
+                    ocring.discard(fut)
+                    yield fut.result()
+                    continue
+                detecting.discard(fut)
+                results = fut.result()
+                if cache is not None:
+                    for src, det in results:
+                        cache.store(src, det)
+                for record in route(results):
+                    yield record
+
+
+def dump_record(rec: Dict) -> bytes:
+    """One JSONL line as UTF-8 bytes."""
+    if orjson is not None:
+        return orjson.dumps(rec, option=orjson.OPT_APPEND_NEWLINE)
+    return (json.dumps(rec, ensure_ascii=False) + "\n").encode("utf-8")
+
+
+def log_writer(f: BinaryIO, records: "queue.SimpleQueue[Optional[Dict]]", errors: List[BaseException]) -> None:
+    """Append records to the JSONL log from one thread until a None sentinel arrives.
+
+    Closes f when done. A write failure is appended to errors for main() to report; the
+    remaining records are still consumed so the queue doesn't grow for the rest of the run.
+    """
+    n = 0
+    rec = None
+    try:
+        with f:
+            while True:
+                rec = records.get()
+                if rec is None:
+                    return
+                f.write(dump_record(rec))
+                n += 1
+                if n % LOG_FLUSH_EVERY == 0:
+                    f.flush()
+    except BaseException as e:
+        errors.append(e)
+        while rec is not None:  # not if the final flush on close is what failed
+            rec = records.get()
+
+
 def main() -> int:
     ap = argparse.ArgumentParser(
         description="STRICT safe OCR pipeline: no overwrite; create __OCRPIPE_OCR__ output, rename original to __OCRPIPE_ORIG__ only after success; parallel across files."
@@ -238,9 +861,23 @@ def main() -> int:
 
     ap.add_argument("--lang", default=DEFAULT_LANG)
     ap.add_argument("--renderer", default=DEFAULT_RENDERER)
-    ap.add_argument("--ocr-jobs", type=int, default=DEFAULT_OCR_JOBS, help="Per-file OCRmyPDF --jobs")
+    ap.add_argument("--ocr-jobs", type=int, default=None,
+                    help="Per-file OCRmyPDF --jobs (default: CPU count / --parallel-files)")
     ap.add_argument("--parallel-files", type=int, default=DEFAULT_PARALLEL_FILES, help="Number of PDFs to OCR concurrently")
 
+    ap.add_argument("--ocr-backend", choices=["inprocess", "pool", "subprocess"], default=DEFAULT_OCR_BACKEND,
+                    help="Spawn ocrmypdf per run (default), call it in-process on threads, "
+                         "or in --parallel-files persistent worker processes")
+    ap.add_argument("--shard-threshold", type=int, default=DEFAULT_SHARD_THRESHOLD,
+                    help="Split PDFs with more pages than this into --parallel-files shards OCR'd concurrently (0 = off)")
+    ap.add_argument("--detect-workers", type=int, default=DEFAULT_DETECT_WORKERS,
+                    help="Processes used for text-coverage detection (default: CPU count, at most 61 on Windows)")
+
+    ap.add_argument("--quick-sniff", action="store_true",
+                    help="Send obvious scans to OCR from raw bytes, without opening them with PyMuPDF.")
+    ap.add_argument("--detect-cache", default="",
+                    help="Optional JSON file remembering detection results for unchanged PDFs across runs.")
+
     ap.add_argument("--sample-pages", type=int, default=DEFAULT_SAMPLE_PAGES)
     ap.add_argument("--page-min-chars", type=int, default=DEFAULT_PAGE_MIN_CHARS)
     ap.add_argument("--min-coverage", type=float, default=DEFAULT_MIN_COVERAGE)
@@ -258,21 +895,57 @@ def main() -> int:
               "Add --execute only when you are satisfied with the dry-run.")
         return 2
 
+    if args.parallel_files < 1 or args.detect_workers < 1:
+        print("ERROR: --parallel-files and --detect-workers must be at least 1.")
+        return 2
+    if MAX_PROCESS_WORKERS and args.detect_workers > MAX_PROCESS_WORKERS:
+        print(f"ERROR: --detect-workers can be at most {MAX_PROCESS_WORKERS} on Windows.")
+        return 2
+
     root = Path(args.root)
     if not root.exists():
         print(f"ERROR: root not found: {root}")
         return 2
 
+    if args.ocr_backend != "subprocess" and (args.extra or importlib.util.find_spec("ocrmypdf") is None):
+        why = "--extra needs the CLI" if args.extra else "ocrmypdf isn't importable from this Python"
+        print(f"Note: using the subprocess OCR backend ({why}).")
+        args.ocr_backend = "subprocess"
+    if MAX_PROCESS_WORKERS and args.ocr_backend == "pool" and args.parallel_files > MAX_PROCESS_WORKERS:
+        print(f"ERROR: --parallel-files can be at most {MAX_PROCESS_WORKERS} with --ocr-backend pool on Windows.")
+        return 2
+
+    # Keep parallel_files * ocr_jobs Tesseract workers within the core count unless told otherwise.
+    ocr_jobs_auto = args.ocr_jobs is None
+    if ocr_jobs_auto:
+        args.ocr_jobs = max(1, (os.cpu_count() or 1) // max(1, args.parallel_files))
+
+    cache: Optional[DetectCache] = None
+    if args.detect_cache:
+        cache = DetectCache(Path(args.detect_cache),
+                            DetectParams(args.sample_pages, args.page_min_chars, args.min_coverage,
+                                         args.quick_sniff))
+        cache.path.parent.mkdir(parents=True, exist_ok=True)
+        cache.load()
+        atexit.register(cache.save)
+
     log_path = Path(args.log) if args.log else None
+    log_fp: Optional[BinaryIO] = None
     if log_path:
-        log_path.parent.mkdir(parents=True, exist_ok=True)
+        try:
+            log_path.parent.mkdir(parents=True, exist_ok=True)
+            log_fp = log_path.open("ab", buffering=1 << 16)
+        except OSError as e:
+            print(f"ERROR: cannot open log {log_path}: {e}")
+            return 2
 
-    pdfs = [p for p in root.rglob("*.pdf") if not is_tagged(p)]
     mode = "EXECUTE" if args.execute else "DRY-RUN"
     print(f"Mode: {mode}")
     print(f"Root: {root}")
-    print(f"Found {len(pdfs)} untagged PDFs")
-    print(f"Parallel files: {args.parallel_files} | Per-file ocrmypdf --jobs: {args.ocr_jobs}")
+    jobs_note = " (auto)" if ocr_jobs_auto else ""
+    print(f"Parallel files: {args.parallel_files} | Per-file ocrmypdf --jobs: {args.ocr_jobs}{jobs_note}"
+          f" | Detect workers: {args.detect_workers}")
+    print(f"OCR backend: {args.ocr_backend}")
     if args.deskew:
         print(f"Deskew: ON ({args.deskew_mode})")
     else:
@@ -280,10 +953,15 @@ def main() -> int:
 
     counts = {"skip": 0, "would_ocr": 0, "ocr_success": 0, "ocr_failed": 0, "rename_orig_failed": 0, "promote_failed": 0}
 
-    with ThreadPoolExecutor(max_workers=args.parallel_files) as ex:
-        futures = {ex.submit(process_one_pdf, p, args): p for p in pdfs}
-        for fut in as_completed(futures):
-            rec = fut.result()
+    total = 0
+
+    async def drain() -> None:
+        nonlocal total
+        # The walker runs up to SIZE_ORDER_WINDOW PDFs ahead of detection so they can be
+        # submitted largest-first; smaller libraries are fully enumerated before work starts.
+        pdfs = largest_first(iter_untagged_pdfs(root), SIZE_ORDER_WINDOW)
+        async for rec in run_pipeline(pdfs, args, cache):
+            total += 1
             action = rec.get("action") or "unknown"
             counts[action] = counts.get(action, 0) + 1
 
@@ -293,20 +971,39 @@ def main() -> int:
                 cov = rec.get("coverage", 0.0)
                 print(f"{action:18} cov={cov:.2f}  {src}")
                 if action in ("ocr_failed", "rename_orig_failed", "promote_failed") and rec.get("error"):
-                    print(f"  error: {rec['error'][:200]}")
+                    print(f"  error: {rec['error'].strip().splitlines()[-1][:200]}")
+
+            if log_records is not None:
+                log_records.put(rec)
 
-            if log_path:
-                with log_path.open("a", encoding="utf-8") as f:
-                    f.write(json.dumps(rec, ensure_ascii=False) + "\n")
+    log_records: Optional[queue.SimpleQueue] = None
+    log_thread: Optional[threading.Thread] = None
+    log_errors: List[BaseException] = []
+    if log_fp is not None:
+        log_records = queue.SimpleQueue()
+        log_thread = threading.Thread(target=log_writer, args=(log_fp, log_records, log_errors), name="jsonl-log")
+        log_thread.start()
+
+    try:
+        asyncio.run(drain())
+        if cache is not None:
+            cache.prune(root)  # only after a full walk; an interrupted run keeps what it had
+    finally:
+        if log_thread is not None:
+            log_records.put(None)
+            log_thread.join()
 
     print("\nSummary:")
-    print(f"  Total PDFs scanned:   {len(pdfs)}")
+    print(f"  Total PDFs scanned:   {total}")
     print(f"  Skipped (searchable): {counts.get('skip', 0)}")
     print(f"  Needs OCR (dry-run):  {counts.get('would_ocr', 0)}")
     print(f"  OCR succeeded:        {counts.get('ocr_success', 0)}")
     print(f"  OCR failed:           {counts.get('ocr_failed', 0)}")
     print(f"  Rename orig failed:   {counts.get('rename_orig_failed', 0)}")
     print(f"  Promote failed:       {counts.get('promote_failed', 0)}")
+    if log_errors:
+        print(f"\nERROR: writing log {log_path} failed: {log_errors[0]}")
+        return 1
     if log_path:
         print(f"  Log: {log_path}")
     if not args.execute: